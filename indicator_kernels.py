@@ -0,0 +1,249 @@
+import numpy as np
+import pandas as pd
+
+# Indicators shared by live prediction, evaluation and training. Training-only and
+# multi-symbol kernels live in training_kernels so predict_api loads only these.
+# Numba is optional; without it rolling_mean, rsi, macd and bollinger_bands fall back to the
+# equivalent pandas expressions. The kernels declare explicit signatures so they compile when
+# this module is imported and are cached in __pycache__ (cache=True); run
+# `python -c "import indicator_kernels"` once after installing to keep JIT compilation off
+# the first prediction request
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Read-only input arrays: pandas copy-on-write hands out read-only views, and writable
+# arrays also match these types
+_F4 = "Array(float32, 1, 'A', readonly=True)"
+_F8 = "Array(float64, 1, 'A', readonly=True)"
+
+@njit(cache=True)
+def _window_add(val, nobs, mean, ssqdm, same_run, prev):
+    """Add one observation to running window mean / sum of squared deviations (Welford)"""
+    val = float(val)
+    if val == val:
+        if val == prev:
+            same_run += 1
+        else:
+            same_run = 1
+            prev = val
+        nobs += 1
+        delta = val - mean
+        mean += delta / nobs
+        ssqdm += delta * (val - mean)
+    return nobs, mean, ssqdm, same_run, prev
+
+@njit(cache=True)
+def _window_remove(val, nobs, mean, ssqdm):
+    """Remove one observation from running window mean / sum of squared deviations"""
+    val = float(val)
+    if val == val:
+        nobs -= 1
+        if nobs > 0:
+            delta = val - mean
+            mean -= delta / nobs
+            ssqdm -= delta * (val - mean)
+        else:
+            mean = 0.0
+            ssqdm = 0.0
+    return nobs, mean, ssqdm
+
+@njit(cache=True)
+def _window_stats(nobs, mean, ssqdm, same_run, prev):
+    """Mean and sample std (ddof=1) of a full window"""
+    # A constant window has exactly zero spread, like pandas rolling
+    if same_run >= nobs:
+        return prev, 0.0
+    return mean, np.sqrt(max(ssqdm / (nobs - 1), 0.0))
+
+@njit(cache=True)
+def _ewm_update(cur, weighted, old_wt, decay):
+    """One step of pandas' adjusted exponentially weighted mean (adjust=True, ignore_na=False)"""
+    cur = float(cur)
+    if weighted == weighted:
+        old_wt *= decay
+        if cur == cur:
+            if weighted != cur:
+                weighted = (old_wt * weighted + cur) / (old_wt + 1.0)
+            old_wt += 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+@njit([f'float64[:]({_F4}, int64)', f'float64[:]({_F8}, int64)'], cache=True)
+def _rolling_mean(values, window):
+    """Kernel behind rolling_mean"""
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    same_run = 0
+    prev = np.nan
+
+    for i in range(n):
+        nobs, mean, ssqdm, same_run, prev = _window_add(values[i], nobs, mean, ssqdm, same_run, prev)
+        if i >= window:
+            nobs, mean, ssqdm = _window_remove(values[i - window], nobs, mean, ssqdm)
+        if nobs >= window:
+            out[i] = _window_stats(nobs, mean, ssqdm, same_run, prev)[0]
+
+    return out
+
+def rolling_mean(values, window):
+    """
+    Rolling mean with O(1) window updates
+    Matches pandas rolling(window).mean() semantics
+    """
+    if NUMBA_AVAILABLE:
+        return _rolling_mean(values, window)
+    return pd.Series(values, dtype=np.float64).rolling(window=window).mean().to_numpy()
+
+@njit([f'float64[:]({_F4}, int64)', f'float64[:]({_F8}, int64)'], cache=True)
+def _rsi(close, window):
+    """Kernel behind rsi"""
+    n = close.shape[0]
+    out = np.full(n, np.nan)
+    sum_gain = 0.0
+    sum_loss = 0.0
+    # Count of non-zero terms in the window so an all-flat window gives exact zero sums
+    n_gain = 0
+    n_loss = 0
+
+    for i in range(n):
+        if i >= 1:
+            delta = float(close[i]) - float(close[i - 1])
+            if delta > 0:
+                sum_gain += delta
+                n_gain += 1
+            elif delta < 0:
+                sum_loss -= delta
+                n_loss += 1
+
+        # Drop the delta that left the window (the first bar has no delta)
+        j = i - window
+        if j >= 1:
+            delta = float(close[j]) - float(close[j - 1])
+            if delta > 0:
+                sum_gain -= delta
+                n_gain -= 1
+            elif delta < 0:
+                sum_loss += delta
+                n_loss -= 1
+
+        if n_gain == 0:
+            sum_gain = 0.0
+        if n_loss == 0:
+            sum_loss = 0.0
+
+        if i >= window - 1:
+            if sum_loss > 0:
+                out[i] = 100.0 - 100.0 / (1.0 + sum_gain / sum_loss)
+            elif sum_gain > 0:
+                out[i] = 100.0
+
+    return out
+
+def rsi(close, window):
+    """
+    RSI from rolling mean gain/loss in a single O(N) pass
+    Matches pandas diff().where().rolling(window).mean() semantics
+    """
+    if NUMBA_AVAILABLE:
+        return _rsi(close, window)
+    delta = pd.Series(close, dtype=np.float64).diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=window).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=window).mean()
+    return (100 - (100 / (1 + gain / loss))).to_numpy()
+
+@njit([f'UniTuple(float64[:], 4)({_F4}, int64, float64)',
+       f'UniTuple(float64[:], 4)({_F8}, int64, float64)'], cache=True)
+def _bollinger_bands(close, window, num_std):
+    """Kernel behind bollinger_bands"""
+    n = close.shape[0]
+    middle = np.full(n, np.nan)
+    upper = np.full(n, np.nan)
+    lower = np.full(n, np.nan)
+    position = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    same_run = 0
+    prev = np.nan
+
+    for i in range(n):
+        nobs, mean, ssqdm, same_run, prev = _window_add(close[i], nobs, mean, ssqdm, same_run, prev)
+        if i >= window:
+            nobs, mean, ssqdm = _window_remove(close[i - window], nobs, mean, ssqdm)
+
+        if nobs >= window:
+            mid, std = _window_stats(nobs, mean, ssqdm, same_run, prev)
+            middle[i] = mid
+            upper[i] = mid + std * num_std
+            lower[i] = mid - std * num_std
+            width = upper[i] - lower[i]
+            if width != 0:
+                position[i] = (float(close[i]) - lower[i]) / width
+
+    return middle, upper, lower, position
+
+def bollinger_bands(close, window, num_std):
+    """
+    Bollinger Bands (middle, upper, lower, position) in a single pass
+    Matches pandas rolling(window).mean() / .std() semantics
+    """
+    if NUMBA_AVAILABLE:
+        return _bollinger_bands(close, window, num_std)
+    close = pd.Series(close, dtype=np.float64)
+    middle = close.rolling(window=window).mean()
+    std = close.rolling(window=window).std()
+    upper = middle + (std * num_std)
+    lower = middle - (std * num_std)
+    position = (close - lower) / (upper - lower)
+    return middle.to_numpy(), upper.to_numpy(), lower.to_numpy(), position.to_numpy()
+
+@njit([f'UniTuple(float64[:], 3)({_F4}, int64, int64, int64)',
+       f'UniTuple(float64[:], 3)({_F8}, int64, int64, int64)'], cache=True)
+def _macd(close, fast_span, slow_span, signal_span):
+    """Kernel behind macd"""
+    n = close.shape[0]
+    macd_line = np.full(n, np.nan)
+    signal = np.full(n, np.nan)
+    histogram = np.full(n, np.nan)
+    fast_decay = 1.0 - 2.0 / (fast_span + 1.0)
+    slow_decay = 1.0 - 2.0 / (slow_span + 1.0)
+    signal_decay = 1.0 - 2.0 / (signal_span + 1.0)
+    fast, fast_wt = np.nan, 1.0
+    slow, slow_wt = np.nan, 1.0
+    sig, sig_wt = np.nan, 1.0
+
+    for i in range(n):
+        fast, fast_wt = _ewm_update(close[i], fast, fast_wt, fast_decay)
+        slow, slow_wt = _ewm_update(close[i], slow, slow_wt, slow_decay)
+        m = fast - slow
+        sig, sig_wt = _ewm_update(m, sig, sig_wt, signal_decay)
+        macd_line[i] = m
+        signal[i] = sig
+        histogram[i] = m - sig
+
+    return macd_line, signal, histogram
+
+def macd(close, fast_span, slow_span, signal_span):
+    """
+    MACD line, signal and histogram in a single pass
+    Matches pandas ewm(span=...).mean() semantics
+    """
+    if NUMBA_AVAILABLE:
+        return _macd(close, fast_span, slow_span, signal_span)
+    close = pd.Series(close, dtype=np.float64)
+    macd_line = close.ewm(span=fast_span).mean() - close.ewm(span=slow_span).mean()
+    signal = macd_line.ewm(span=signal_span).mean()
+    return macd_line.to_numpy(), signal.to_numpy(), (macd_line - signal).to_numpy()
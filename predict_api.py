@@ -1,137 +1,180 @@
 #!/usr/bin/env python3
 import sys
+import os
 import json
 import pandas as pd
 import numpy as np
 import joblib
 import warnings
+from indicator_kernels import rolling_mean, rsi, macd, bollinger_bands
 warnings.filterwarnings('ignore')
 
+MODEL_FILES = ('crypto_profit_model.pkl', 'feature_scaler.pkl', 'feature_columns.pkl')
+
+# Loaded model components keyed by (path, mtime) so retraining invalidates the cache
+_MODEL_CACHE = {}
+
+# Rows of history needed to compute the latest row's features. The longest rolling window
+# is 20 bars; the EWMs (span up to 18) leave ~2e-10 of weight beyond 200 bars.
+# The 0.1% / 99.9% outlier caps in create_features are also taken over these rows only, not
+# over the whole request (the UI sends 500 klines). With fewer rows the 99.9% cap sits closer
+# to the column maximum, so when the latest bar is a column extreme (rising Close/MAs, a volume
+# spike) it is capped more strongly than it was on the full request
+MAX_LOOKBACK = 200
+
+# NaN fill groups used by create_features (ratios -> 1.0 neutral, percentage changes -> 0.0)
+RATIO_COLUMNS = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position',
+                 'price_to_ma_5', 'price_to_ma_10', 'price_to_ma_20']
+PCT_COLUMNS = ['price_change', 'volume_change']
+
 def create_features(df):
     """Create technical indicators and features from OHLCV data (matching training exactly)"""
-    df = df.copy()
+    # Shallow copy: only whole columns are replaced below, so the caller's data is never written
+    df = df.copy(deep=False)
+    
+    # Work on float32 OHLCV to halve memory traffic in the rolling/EWM features
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        df[col] = df[col].astype(np.float32, copy=False)
+    
+    # Keep Open time as epoch ms (no feature uses it) and sort only if klines arrive out of order
+    times = df['Open time'].to_numpy()
+    if not (np.diff(times) >= 0).all():
+        df = df.iloc[np.argsort(times, kind='stable')].reset_index(drop=True)
     
-    # Convert Open time to datetime
-    df['Open time'] = pd.to_datetime(df['Open time'], unit='ms')
-    df = df.sort_values('Open time').reset_index(drop=True)
+    # Build every feature first and attach them with a single concat below,
+    # rather than inserting columns into the frame one at a time
+    close = df['Close']
+    close_values = close.to_numpy()
+    volume = df['Volume']
+    features = {}
     
     # Price-based features
-    df['price_change'] = df['Close'].pct_change()
-    df['high_low_ratio'] = df['High'] / df['Low']
-    df['close_open_ratio'] = df['Close'] / df['Open']
-    df['volume_change'] = df['Volume'].pct_change()
+    features['price_change'] = close.pct_change()
+    features['high_low_ratio'] = df['High'] / df['Low']
+    features['close_open_ratio'] = close / df['Open']
+    features['volume_change'] = volume.pct_change()
     
     # Moving averages (matching training - reduced windows)
-    for window in [5, 10, 20]:
-        df[f'ma_{window}'] = df['Close'].rolling(window=window).mean()
-        df[f'price_to_ma_{window}'] = df['Close'] / df[f'ma_{window}']
+    ma_windows = [5, 10, 20]
+    moving_averages = np.column_stack([rolling_mean(close_values, window) for window in ma_windows])
+    price_to_ma = close_values[:, None] / moving_averages
+    for i, window in enumerate(ma_windows):
+        features[f'ma_{window}'] = moving_averages[:, i]
+        features[f'price_to_ma_{window}'] = price_to_ma[:, i]
     
     # Volatility features
-    df['volatility_5'] = df['Close'].rolling(window=5).std()
-    df['volatility_10'] = df['Close'].rolling(window=10).std()
+    features['volatility_5'] = close.rolling(window=5).std()
+    features['volatility_10'] = close.rolling(window=10).std()
     
     # Volume features
-    df['volume_ma_5'] = df['Volume'].rolling(window=5).mean()
-    df['volume_ratio'] = df['Volume'] / df['volume_ma_5']
+    features['volume_ma_5'] = volume.rolling(window=5).mean()
+    features['volume_ratio'] = volume / features['volume_ma_5']
     
     # RSI-like indicator (matching training - reduced window to 10)
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=10).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=10).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    features['rsi'] = rsi(close_values, 10)
     
     # MACD-like indicator (matching training - reduced windows)
-    exp1 = df['Close'].ewm(span=8).mean()
-    exp2 = df['Close'].ewm(span=18).mean()
-    df['macd'] = exp1 - exp2
-    df['macd_signal'] = df['macd'].ewm(span=6).mean()
-    df['macd_histogram'] = df['macd'] - df['macd_signal']
+    features['macd'], features['macd_signal'], features['macd_histogram'] = macd(close_values, 8, 18, 6)
     
     # Bollinger Bands (matching training - reduced window to 15)
-    df['bb_middle'] = df['Close'].rolling(window=15).mean()
-    bb_std = df['Close'].rolling(window=15).std()
-    df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-    df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-    df['bb_position'] = (df['Close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+    (features['bb_middle'], features['bb_upper'],
+     features['bb_lower'], features['bb_position']) = bollinger_bands(close_values, 15, 2.0)
+    
+    df = pd.concat([df, pd.DataFrame(features, index=df.index)], axis=1)
     
     # Clean infinite and extreme values (matching training)
     df = df.replace([np.inf, -np.inf], np.nan)
     
-    # Cap extreme values using percentiles
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        if col not in ['Open time']:
-            q99 = df[col].quantile(0.999)
-            q01 = df[col].quantile(0.001)
-            df[col] = df[col].clip(lower=q01, upper=q99)
-    
-    # Handle division by zero cases
-    ratio_columns = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position']
-    for col in ratio_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(1.0)
-    
-    # Handle percentage changes
-    pct_columns = ['price_change', 'volume_change']
-    for col in pct_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(0.0)
-    
-    # Handle price-to-MA ratios
-    ma_ratio_columns = [col for col in df.columns if 'price_to_ma_' in col]
-    for col in ma_ratio_columns:
-        df[col] = df[col].fillna(1.0)
-    
-    # Handle RSI
-    if 'rsi' in df.columns:
-        df['rsi'] = df['rsi'].fillna(50.0)
-        df['rsi'] = df['rsi'].clip(0, 100)
+    # Cap extreme values using percentiles (one vectorized pass over the numeric block)
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.drop('Open time', errors='ignore')
+    values = df[numeric_columns].to_numpy(dtype=np.float64, copy=True)
+    q01, q99 = np.nanquantile(values, [0.001, 0.999], axis=0)
+    np.clip(values, q01, q99, out=values)
+    df[numeric_columns] = values
+    
+    # Fill NaNs with neutral values: one block write per fill value instead of a fillna per column
+    fill_groups = [
+        (RATIO_COLUMNS, 1.0),
+        (PCT_COLUMNS, 0.0),
+        (['rsi'], 50.0),
+    ]
+    for columns, fill_value in fill_groups:
+        block = df[columns].to_numpy(dtype=np.float64, copy=True)
+        np.nan_to_num(block, copy=False, nan=fill_value)
+        df[columns] = block
+    df['rsi'] = df['rsi'].clip(0, 100)
     
     return df
 
 def load_model():
-    """Load the trained model and components"""
+    """Load the trained model and components (cached across calls)"""
     try:
-        model = joblib.load('crypto_profit_model.pkl')
-        scaler = joblib.load('feature_scaler.pkl')
-        feature_columns = joblib.load('feature_columns.pkl')
-        return model, scaler, feature_columns
+        key = tuple((path, os.path.getmtime(path)) for path in MODEL_FILES)
+        if key not in _MODEL_CACHE:
+            _MODEL_CACHE.clear()
+            _MODEL_CACHE[key] = tuple(joblib.load(path) for path in MODEL_FILES)
+        return _MODEL_CACHE[key]
     except FileNotFoundError as e:
         raise Exception(f"Model files not found: {e}")
 
+def error_result(error):
+    """Neutral WAIT response carrying an error message"""
+    return {
+        'error': str(error),
+        'prediction': 0,
+        'probability': 0.5,
+        'confidence': 'low',
+        'recommendation': 'WAIT'
+    }
+
 def predict_live(kline_data):
-    """Generate prediction for live data"""
+    """Generate prediction for live data, loading the model components first"""
     try:
-        # Load model components
         model, scaler, feature_columns = load_model()
-        
+    except Exception as e:
+        return error_result(e)
+    
+    return predict_live_prepared(kline_data, model, scaler, feature_columns)
+
+def predict_live_prepared(kline_data, model, scaler, feature_columns):
+    """Generate prediction for live data with already loaded model components"""
+    try:
         # Convert to DataFrame
         df = pd.DataFrame(kline_data)
+        if not df['Open time'].is_monotonic_increasing:
+            df = df.sort_values('Open time').reset_index(drop=True)
         
-        # Create features
-        df_with_features = create_features(df)
+        # Create features on the tail only; just the latest row is used
+        # (outlier caps come from the tail too, see MAX_LOOKBACK)
+        df_tail = df.iloc[-MAX_LOOKBACK:] if len(df) > MAX_LOOKBACK else df
+        df_with_features = create_features(df_tail)
         
-        # Get the latest data point with all features
-        latest_data = df_with_features[feature_columns].iloc[-1:]
+        # Get the latest data point with all features as a (1, n_features) array
+        col_idx = df_with_features.columns.get_indexer(feature_columns)
+        if (col_idx < 0).any():
+            missing = [col for col, idx in zip(feature_columns, col_idx) if idx < 0]
+            raise KeyError(f"Missing feature columns: {missing}")
+        latest_data = df_with_features.iloc[-1:, col_idx].to_numpy(dtype=np.float64)
         
         # Check if we have valid data
-        if latest_data.isna().any().any():
+        missing_values = np.isnan(latest_data)
+        if missing_values.any():
             return {
                 'error': 'Insufficient data for prediction',
                 'prediction': 0,
                 'probability': 0.5,
                 'confidence': 'low',
                 'recommendation': 'WAIT',
-                'features_available': len([col for col in feature_columns if not latest_data[col].isna().any()])
+                'features_available': int((~missing_values).sum())
             }
         
         # Scale features
         features_scaled = scaler.transform(latest_data)
         
-        # Make prediction
-        prediction = model.predict(features_scaled)[0]
-        probability = model.predict_proba(features_scaled)[0, 1]
+        # Make prediction (label from the same probabilities, as model.predict does)
+        proba = model.predict_proba(features_scaled)[0]
+        prediction = model.classes_[proba.argmax()]
+        probability = proba[1]
         
         # Determine confidence and recommendation
         confidence = 'high' if probability >= 0.8 or probability <= 0.2 else 'medium' if probability >= 0.7 or probability <= 0.3 else 'low'
@@ -161,39 +204,33 @@ def predict_live(kline_data):
                 'volatility': float(df_with_features['volatility_10'].iloc[-1]) if 'volatility_10' in df_with_features.columns else None
             },
             'data_points': len(df),
-            'timestamp': int(pd.Timestamp(df['Open time'].iloc[-1]).timestamp() * 1000)
+            'timestamp': int(df['Open time'].iloc[-1])
         }
         
     except Exception as e:
-        return {
-            'error': str(e),
-            'prediction': 0,
-            'probability': 0.5,
-            'confidence': 'low',
-            'recommendation': 'WAIT'
-        }
+        return error_result(e)
 
 def main():
-    try:
-        # Read JSON data from stdin
-        input_data = sys.stdin.read()
-        kline_data = json.loads(input_data)
-        
-        # Generate prediction
-        result = predict_live(kline_data)
+    # Answer one JSON request per line from stdin. predict_live goes through the mtime-keyed
+    # model cache, so a long-lived worker loads the model once and picks up a retrained one
+    failed = False
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            kline_data = json.loads(line)
+            
+            # Generate prediction
+            result = predict_live(kline_data)
+            
+        except Exception as e:
+            failed = True
+            result = error_result(e)
         
         # Output result as JSON
-        print(json.dumps(result))
-        
-    except Exception as e:
-        error_result = {
-            'error': str(e),
-            'prediction': 0,
-            'probability': 0.5,
-            'confidence': 'low',
-            'recommendation': 'WAIT'
-        }
-        print(json.dumps(error_result))
+        print(json.dumps(result), flush=True)
+    
+    if failed:
         sys.exit(1)
 
 if __name__ == "__main__":
@@ -1,6 +1,93 @@
 import { NextRequest, NextResponse } from 'next/server';
 import { spawn } from 'child_process';
 import path from 'path';
+import readline from 'readline';
+
+interface PendingPrediction {
+  resolve: (result: unknown) => void;
+  reject: (error: Error) => void;
+  timer: NodeJS.Timeout;
+}
+
+type PredictionWorker = (csvData: Record<string, unknown>[]) => Promise<unknown>;
+
+// A worker that has not answered within this time (first request included, which may
+// compile the numba kernels) is killed and replaced
+const PREDICTION_TIMEOUT_MS = 60000;
+
+// One long-lived predict_api.py worker answers newline-delimited requests in order, so the
+// Python start-up, imports and model load are paid once instead of on every request
+let worker: PredictionWorker | null = null;
+
+function startWorker(): PredictionWorker {
+  const pythonProcess = spawn('python3', [
+    path.join(process.cwd(), 'predict_api.py')
+  ]);
+  // Requests written to this process only, oldest first
+  const pending: PendingPrediction[] = [];
+  let errorOutput = '';
+
+  // Fail this process's waiting requests, stop it and let the next request start a fresh worker
+  const fail = (error: Error) => {
+    if (worker === request) {
+      worker = null;
+    }
+    pending.splice(0).forEach(({ reject, timer }) => {
+      clearTimeout(timer);
+      reject(error);
+    });
+    pythonProcess.kill();
+  };
+
+  // Each output line answers the oldest waiting request
+  readline.createInterface({ input: pythonProcess.stdout }).on('line', (line) => {
+    const prediction = pending.shift();
+    if (!prediction) {
+      return;
+    }
+    clearTimeout(prediction.timer);
+    try {
+      prediction.resolve(JSON.parse(line));
+    } catch (e) {
+      prediction.reject(new Error(`Failed to parse Python output: ${line}`));
+    }
+  });
+
+  pythonProcess.stderr.on('data', (data) => {
+    // Keep only the tail for error messages
+    errorOutput = (errorOutput + data.toString()).slice(-4000);
+  });
+
+  pythonProcess.stdin.on('error', (error) => {
+    fail(new Error(`Failed to write to Python process: ${error.message}`));
+  });
+
+  pythonProcess.on('close', (code) => {
+    fail(new Error(`Python script failed with code ${code}: ${errorOutput}`));
+  });
+
+  pythonProcess.on('error', (error) => {
+    fail(new Error(`Failed to start Python process: ${error.message}`));
+  });
+
+  const request: PredictionWorker = (csvData) => new Promise((resolve, reject) => {
+    const timer = setTimeout(() => {
+      fail(new Error(`Python script did not answer within ${PREDICTION_TIMEOUT_MS} ms`));
+    }, PREDICTION_TIMEOUT_MS);
+    pending.push({ resolve, reject, timer });
+    // Send one request per line to the worker's stdin
+    pythonProcess.stdin.write(JSON.stringify(csvData) + '\n');
+  });
+
+  return request;
+}
+
+function requestPrediction(csvData: Record<string, unknown>[]): Promise<unknown> {
+  if (!worker) {
+    worker = startWorker();
+  }
+  return worker(csvData);
+}
 
 export async function POST(req: NextRequest) {
   try {
@@ -22,44 +109,7 @@ export async function POST(req: NextRequest) {
       'Close time': kline[6],
     }));
 
-    // Create a promise to handle the Python script execution
-    const prediction = await new Promise((resolve, reject) => {
-      const pythonProcess = spawn('python3', [
-        path.join(process.cwd(), 'predict_api.py')
-      ]);
-
-      let output = '';
-      let errorOutput = '';
-
-      // Send data to Python script via stdin
-      pythonProcess.stdin.write(JSON.stringify(csvData));
-      pythonProcess.stdin.end();
-
-      pythonProcess.stdout.on('data', (data) => {
-        output += data.toString();
-      });
-
-      pythonProcess.stderr.on('data', (data) => {
-        errorOutput += data.toString();
-      });
-
-      pythonProcess.on('close', (code) => {
-        if (code === 0) {
-          try {
-            const result = JSON.parse(output.trim());
-            resolve(result);
-          } catch (e) {
-            reject(new Error(`Failed to parse Python output: ${output}`));
-          }
-        } else {
-          reject(new Error(`Python script failed with code ${code}: ${errorOutput}`));
-        }
-      });
-
-      pythonProcess.on('error', (error) => {
-        reject(new Error(`Failed to start Python process: ${error.message}`));
-      });
-    });
+    const prediction = await requestPrediction(csvData);
 
     return NextResponse.json(prediction);
   } catch (error) {
@@ -70,4 +120,4 @@ export async function POST(req: NextRequest) {
       { status: 500 }
     );
   }
-}
\ No newline at end of file
+}
@@ -1,64 +1,82 @@
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+import sys
 import joblib
-import matplotlib.pyplot as plt
-import seaborn as sns
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score, roc_auc_score, roc_curve
 import warnings
-import gc
+from indicator_kernels import rolling_mean, rsi, macd, bollinger_bands
 warnings.filterwarnings('ignore')
 
+# Try to import pyarrow for the multi-threaded CSV parser (optional optimization)
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Only the OHLCV columns are used, read directly as float32
+OHLCV_COLUMNS = ['Open time', 'Open', 'High', 'Low', 'Close', 'Volume']
+OHLCV_DTYPES = {'Open': 'float32', 'High': 'float32', 'Low': 'float32', 'Close': 'float32', 'Volume': 'float32'}
+
+# NaN fill groups used by create_features (ratios -> 1.0 neutral, percentage changes -> 0.0)
+RATIO_COLUMNS = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position',
+                 'price_to_ma_5', 'price_to_ma_10', 'price_to_ma_20']
+PCT_COLUMNS = ['price_change', 'volume_change']
+
 def create_features(df):
     """Create technical indicators and features from OHLCV data (matching training exactly)"""
-    df = df.copy()
+    # Shallow copy: only whole columns are replaced below, so the caller's data is never written
+    df = df.copy(deep=False)
+    
+    # Work on float32 OHLCV to halve memory traffic in the rolling/EWM features
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        df[col] = df[col].astype(np.float32, copy=False)
     
     # Convert Open time to datetime
     df['Open time'] = pd.to_datetime(df['Open time'])
     df = df.sort_values('Open time').reset_index(drop=True)
     
+    # Build every feature first and attach them with a single concat below,
+    # rather than inserting columns into the frame one at a time
+    close = df['Close']
+    close_values = close.to_numpy()
+    volume = df['Volume']
+    features = {}
+    
     # Price-based features
-    df['price_change'] = df['Close'].pct_change()
-    df['high_low_ratio'] = df['High'] / df['Low']
-    df['close_open_ratio'] = df['Close'] / df['Open']
-    df['volume_change'] = df['Volume'].pct_change()
+    features['price_change'] = close.pct_change()
+    features['high_low_ratio'] = df['High'] / df['Low']
+    features['close_open_ratio'] = close / df['Open']
+    features['volume_change'] = volume.pct_change()
     
     # Moving averages (matching training - reduced windows)
-    for window in [5, 10, 20]:
-        df[f'ma_{window}'] = df['Close'].rolling(window=window).mean()
-        df[f'price_to_ma_{window}'] = df['Close'] / df[f'ma_{window}']
+    ma_windows = [5, 10, 20]
+    moving_averages = np.column_stack([rolling_mean(close_values, window) for window in ma_windows])
+    price_to_ma = close_values[:, None] / moving_averages
+    for i, window in enumerate(ma_windows):
+        features[f'ma_{window}'] = moving_averages[:, i]
+        features[f'price_to_ma_{window}'] = price_to_ma[:, i]
     
     # Volatility features
-    df['volatility_5'] = df['Close'].rolling(window=5).std()
-    df['volatility_10'] = df['Close'].rolling(window=10).std()
+    features['volatility_5'] = close.rolling(window=5).std()
+    features['volatility_10'] = close.rolling(window=10).std()
     
     # Volume features
-    df['volume_ma_5'] = df['Volume'].rolling(window=5).mean()
-    df['volume_ratio'] = df['Volume'] / df['volume_ma_5']
+    features['volume_ma_5'] = volume.rolling(window=5).mean()
+    features['volume_ratio'] = volume / features['volume_ma_5']
     
     # RSI-like indicator (matching training - reduced window to 10)
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=10).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=10).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    features['rsi'] = rsi(close_values, 10)
     
     # MACD-like indicator (matching training - reduced windows)
-    exp1 = df['Close'].ewm(span=8).mean()
-    exp2 = df['Close'].ewm(span=18).mean()
-    df['macd'] = exp1 - exp2
-    df['macd_signal'] = df['macd'].ewm(span=6).mean()
-    df['macd_histogram'] = df['macd'] - df['macd_signal']
+    features['macd'], features['macd_signal'], features['macd_histogram'] = macd(close_values, 8, 18, 6)
     
     # Bollinger Bands (matching training - reduced window to 15)
-    df['bb_middle'] = df['Close'].rolling(window=15).mean()
-    bb_std = df['Close'].rolling(window=15).std()
-    df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
-    df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
-    df['bb_position'] = (df['Close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
+    (features['bb_middle'], features['bb_upper'],
+     features['bb_lower'], features['bb_position']) = bollinger_bands(close_values, 15, 2.0)
     
-    # Clean up intermediate variables
-    del delta, gain, loss, rs, exp1, exp2, bb_std
-    gc.collect()
+    df = pd.concat([df, pd.DataFrame(features, index=df.index)], axis=1)
     
     # ✅ CRITICAL: Add same data cleaning as training script
     print("Cleaning infinite and extreme values...")
@@ -67,35 +85,24 @@ def create_features(df):
     df = df.replace([np.inf, -np.inf], np.nan)
     
     # Cap extreme values using percentiles (99.9th percentile)
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        if col not in ['Open time']:  # Skip datetime columns
-            q99 = df[col].quantile(0.999)
-            q01 = df[col].quantile(0.001)
-            df[col] = df[col].clip(lower=q01, upper=q99)
-    
-    # Handle division by zero cases specifically
-    # Replace NaN ratios with 1.0 (neutral ratio)
-    ratio_columns = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position']
-    for col in ratio_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(1.0)
-    
-    # Handle percentage changes - replace NaN with 0
-    pct_columns = ['price_change', 'volume_change']
-    for col in pct_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(0.0)
-    
-    # Handle price-to-MA ratios - replace NaN with 1.0
-    ma_ratio_columns = [col for col in df.columns if 'price_to_ma_' in col]
-    for col in ma_ratio_columns:
-        df[col] = df[col].fillna(1.0)
-    
-    # Handle RSI - replace NaN with 50 (neutral)
-    if 'rsi' in df.columns:
-        df['rsi'] = df['rsi'].fillna(50.0)
-        df['rsi'] = df['rsi'].clip(0, 100)  # Ensure RSI is in valid range
+    # Single vectorized quantile + clip over the numeric block instead of a per-column loop
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.drop('Open time', errors='ignore')
+    values = df[numeric_columns].to_numpy(dtype=np.float64, copy=True)
+    q01, q99 = np.nanquantile(values, [0.001, 0.999], axis=0)
+    np.clip(values, q01, q99, out=values)
+    df[numeric_columns] = values
+    
+    # Fill NaNs with neutral values: one block write per fill value instead of a fillna per column
+    fill_groups = [
+        (RATIO_COLUMNS, 1.0),
+        (PCT_COLUMNS, 0.0),
+        (['rsi'], 50.0),
+    ]
+    for columns, fill_value in fill_groups:
+        block = df[columns].to_numpy(dtype=np.float64, copy=True)
+        np.nan_to_num(block, copy=False, nan=fill_value)
+        df[columns] = block
+    df['rsi'] = df['rsi'].clip(0, 100)  # Ensure RSI is in valid range
     
     print(f"Data cleaning completed. Shape: {df.shape}")
     
@@ -104,30 +111,28 @@ def create_features(df):
 def create_target_for_validation(df, profit_threshold=0.01, lookforward_periods=30):
     """Create target variable for validation (matching training script)"""
     df = df.copy()
-    df['target'] = 0
     
-    # Use same optimized approach as training
     close_prices = df['Close'].values
     high_prices = df['High'].values
+    target = np.zeros(len(df), dtype=np.int8)
     
-    # Process in smaller chunks for memory efficiency
-    chunk_size = 5000  # Smaller chunks for testing
-    for start_idx in range(0, len(df) - lookforward_periods, chunk_size):
-        end_idx = min(start_idx + chunk_size, len(df) - lookforward_periods)
-        
-        for i in range(start_idx, end_idx):
-            current_price = close_prices[i]
-            future_high_slice = high_prices[i+1:i+1+lookforward_periods]
-            
-            if len(future_high_slice) > 0:
-                max_future_price = np.max(future_high_slice)
-                profit_ratio = (max_future_price - current_price) / current_price
-                
-                if profit_ratio >= profit_threshold:
-                    df.iloc[i, df.columns.get_loc('target')] = 1
+    # Max of the next lookforward_periods highs for every row that has a full window
+    if 0 < lookforward_periods < len(df):
+        windows = sliding_window_view(high_prices[1:], lookforward_periods)
+        max_future_price = windows.max(axis=1)
+        n = len(max_future_price)
+        profit_ratio = (max_future_price - close_prices[:n]) / close_prices[:n]
+        target[:n] = profit_ratio >= profit_threshold
     
+    df['target'] = target
     return df
 
+def load_ohlcv_csv(path='ETHUSD_1m_Binance.csv', nrows=None):
+    """Load the OHLCV columns of the dataset, with the pyarrow parser when available"""
+    # The pyarrow engine does not support nrows
+    engine = 'pyarrow' if PYARROW_AVAILABLE and nrows is None else 'c'
+    return pd.read_csv(path, usecols=OHLCV_COLUMNS, dtype=OHLCV_DTYPES, engine=engine, nrows=nrows)
+
 def load_model():
     """Load the trained model and components"""
     try:
@@ -177,8 +182,9 @@ def backtest_strategy(df, model, scaler, feature_columns, confidence_threshold=0
     df = create_features(df)
     df = create_target_for_validation(df)
     
-    # Remove rows with NaN values
-    df_clean = df[feature_columns + ['target', 'Open time', 'Close']].dropna()
+    # Remove rows with NaN values ('Close' is already a feature column)
+    extra_columns = [col for col in ['target', 'Open time', 'Close'] if col not in feature_columns]
+    df_clean = df[feature_columns + extra_columns].dropna()
     
     if len(df_clean) == 0:
         print("No valid data for backtest after cleaning.")
@@ -186,21 +192,11 @@ def backtest_strategy(df, model, scaler, feature_columns, confidence_threshold=0
     
     print(f"Backtest data shape: {df_clean.shape}")
     
-    # Make predictions in batches to save memory
-    batch_size = 5000
-    predictions = []
-    probabilities = []
-    
-    for i in range(0, len(df_clean), batch_size):
-        batch_end = min(i + batch_size, len(df_clean))
-        X_batch = df_clean[feature_columns].iloc[i:batch_end]
-        X_batch_scaled = scaler.transform(X_batch)
-        
-        batch_pred = model.predict(X_batch_scaled)
-        batch_prob = model.predict_proba(X_batch_scaled)[:, 1]
-        
-        predictions.extend(batch_pred)
-        probabilities.extend(batch_prob)
+    # Make predictions in one call; labels come from the same probabilities
+    X = df_clean[feature_columns].to_numpy(dtype=np.float32)
+    proba = model.predict_proba(scaler.transform(X))
+    predictions = model.classes_.take(proba.argmax(axis=1))
+    probabilities = proba[:, 1]
     
     # Add predictions to dataframe
     df_clean['prediction'] = predictions
@@ -223,8 +219,8 @@ def backtest_strategy(df, model, scaler, feature_columns, confidence_threshold=0
     
     return df_clean
 
-def evaluate_model_performance(df_test, model, scaler, feature_columns):
-    """Evaluate model performance on test data (memory optimized)"""
+def evaluate_model_performance(df_test, model, scaler, feature_columns, plot=False):
+    """Evaluate model performance on test data (memory optimized); plot=True also saves PNG charts"""
     print("Evaluating model performance...")
     
     # Sample test data if too large
@@ -246,32 +242,19 @@ def evaluate_model_performance(df_test, model, scaler, feature_columns):
     
     print(f"Evaluation data shape: {df_clean.shape}")
     
-    X_test = df_clean[feature_columns]
+    X_test = df_clean[feature_columns].to_numpy(dtype=np.float32)
     y_test = df_clean['target']
     
-    # Scale features in batches
-    batch_size = 5000
-    y_pred = []
-    y_pred_proba = []
-    
-    for i in range(0, len(X_test), batch_size):
-        batch_end = min(i + batch_size, len(X_test))
-        X_batch = X_test.iloc[i:batch_end]
-        X_batch_scaled = scaler.transform(X_batch)
-        
-        batch_pred = model.predict(X_batch_scaled)
-        batch_prob = model.predict_proba(X_batch_scaled)[:, 1]
-        
-        y_pred.extend(batch_pred)
-        y_pred_proba.extend(batch_prob)
-    
-    y_pred = np.array(y_pred)
-    y_pred_proba = np.array(y_pred_proba)
+    # Scale and predict in one call; labels come from the same probabilities
+    proba = model.predict_proba(scaler.transform(X_test))
+    y_pred = model.classes_.take(proba.argmax(axis=1))
+    y_pred_proba = proba[:, 1]
     
     # Print metrics
     print(f"\nTest Set Performance:")
+    auc = roc_auc_score(y_test, y_pred_proba)
     print(f"Accuracy: {accuracy_score(y_test, y_pred):.4f}")
-    print(f"ROC AUC: {roc_auc_score(y_test, y_pred_proba):.4f}")
+    print(f"ROC AUC: {auc:.4f}")
     print(f"\nTarget distribution in test set:")
     print(y_test.value_counts())
     print(f"Profit opportunity percentage: {y_test.mean()*100:.2f}%")
@@ -279,45 +262,60 @@ def evaluate_model_performance(df_test, model, scaler, feature_columns):
     print(f"\nClassification Report:")
     print(classification_report(y_test, y_pred))
     
-    # Create smaller plots to save memory
-    try:
-        # Plot ROC curve
-        fpr, tpr, thresholds = roc_curve(y_test, y_pred_proba)
-        plt.figure(figsize=(6, 4))
-        plt.plot(fpr, tpr, label=f'ROC Curve (AUC = {roc_auc_score(y_test, y_pred_proba):.3f})')
-        plt.plot([0, 1], [0, 1], 'k--', label='Random')
-        plt.xlabel('False Positive Rate')
-        plt.ylabel('True Positive Rate')
-        plt.title('ROC Curve')
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig('roc_curve.png', dpi=100, bbox_inches='tight')
-        plt.close()
-        
-        # Plot probability distribution (sample if too large)
-        if len(y_pred_proba) > 10000:
-            sample_indices = np.random.choice(len(y_pred_proba), 10000, replace=False)
-            y_pred_proba_sample = y_pred_proba[sample_indices]
-            y_test_sample = y_test.iloc[sample_indices]
-        else:
-            y_pred_proba_sample = y_pred_proba
-            y_test_sample = y_test
-        
-        plt.figure(figsize=(8, 4))
-        plt.hist(y_pred_proba_sample[y_test_sample == 0], alpha=0.7, label='No Profit', bins=30)
-        plt.hist(y_pred_proba_sample[y_test_sample == 1], alpha=0.7, label='Profit', bins=30)
-        plt.xlabel('Predicted Probability')
-        plt.ylabel('Frequency')
-        plt.title('Distribution of Predicted Probabilities')
-        plt.legend()
-        plt.grid(True)
-        plt.tight_layout()
-        plt.savefig('probability_distribution.png', dpi=100, bbox_inches='tight')
-        plt.close()
-        
-    except Exception as e:
-        print(f"Warning: Could not create plots due to: {e}")
+    # Probability distribution per class as CSV (no plotting needed)
+    bins = np.linspace(0, 1, 31)
+    y_true = y_test.to_numpy()
+    hist_no_profit, _ = np.histogram(y_pred_proba[y_true == 0], bins=bins)
+    hist_profit, _ = np.histogram(y_pred_proba[y_true == 1], bins=bins)
+    pd.DataFrame({
+        'bin_start': bins[:-1],
+        'bin_end': bins[1:],
+        'no_profit': hist_no_profit,
+        'profit': hist_profit
+    }).to_csv('probability_distribution.csv', index=False)
+    
+    if plot:
+        # Create smaller plots to save memory
+        try:
+            import matplotlib.pyplot as plt
+            
+            # Plot ROC curve
+            fpr, tpr, thresholds = roc_curve(y_test, y_pred_proba)
+            plt.figure(figsize=(6, 4))
+            plt.plot(fpr, tpr, label=f'ROC Curve (AUC = {auc:.3f})')
+            plt.plot([0, 1], [0, 1], 'k--', label='Random')
+            plt.xlabel('False Positive Rate')
+            plt.ylabel('True Positive Rate')
+            plt.title('ROC Curve')
+            plt.legend()
+            plt.grid(True)
+            plt.tight_layout()
+            plt.savefig('roc_curve.png', dpi=100, bbox_inches='tight')
+            plt.close()
+            
+            # Plot probability distribution (sample if too large)
+            if len(y_pred_proba) > 10000:
+                sample_indices = np.random.choice(len(y_pred_proba), 10000, replace=False)
+                y_pred_proba_sample = y_pred_proba[sample_indices]
+                y_test_sample = y_test.iloc[sample_indices]
+            else:
+                y_pred_proba_sample = y_pred_proba
+                y_test_sample = y_test
+            
+            plt.figure(figsize=(8, 4))
+            plt.hist(y_pred_proba_sample[y_test_sample == 0], alpha=0.7, label='No Profit', bins=30)
+            plt.hist(y_pred_proba_sample[y_test_sample == 1], alpha=0.7, label='Profit', bins=30)
+            plt.xlabel('Predicted Probability')
+            plt.ylabel('Frequency')
+            plt.title('Distribution of Predicted Probabilities')
+            plt.legend()
+            plt.grid(True)
+            plt.tight_layout()
+            plt.savefig('probability_distribution.png', dpi=100, bbox_inches='tight')
+            plt.close()
+            
+        except Exception as e:
+            print(f"Warning: Could not create plots due to: {e}")
 
 def test_live_prediction():
     """Test the model with the most recent data points (memory optimized)"""
@@ -330,7 +328,7 @@ def test_live_prediction():
     
     try:
         # Load only recent data to save memory
-        df = pd.read_csv('ETHUSD_1m_Binance.csv')
+        df = load_ohlcv_csv()
         
         # Use only the last 1000 rows for live testing
         df = df.tail(1000).copy()
@@ -364,7 +362,9 @@ def test_live_prediction():
         print(f"Error in live prediction test: {e}")
 
 def main():
-    """Main testing function (memory optimized)"""
+    """Main testing function (memory optimized); pass --plot to also save PNG charts"""
+    plot = '--plot' in sys.argv[1:]
+    
     print("Loading trained model...")
     
     # Load model components
@@ -375,7 +375,7 @@ def main():
     # Load test data with memory management
     print("Loading test data...")
     try:
-        df = pd.read_csv('ETHUSD_1m_Binance.csv')
+        df = load_ohlcv_csv()
         
         # Use last portion of data for testing (memory efficient)
         test_size = min(50000, int(len(df) * 0.2))  # Limit test size
@@ -385,10 +385,9 @@ def main():
         
         # Clear original dataframe
         del df
-        gc.collect()
         
         # Evaluate model performance
-        evaluate_model_performance(df_test, model, scaler, feature_columns)
+        evaluate_model_performance(df_test, model, scaler, feature_columns, plot=plot)
         
         # Backtest strategy
         print("\nRunning backtest...")
@@ -408,15 +407,14 @@ def main():
         del df_test
         if results is not None:
             del results
-        gc.collect()
         
     except Exception as e:
         print(f"Error loading test data: {e}")
         print("Trying with smaller sample...")
         try:
             # Try with very small sample
-            df = pd.read_csv('ETHUSD_1m_Binance.csv', nrows=10000)
-            evaluate_model_performance(df, model, scaler, feature_columns)
+            df = load_ohlcv_csv(nrows=10000)
+            evaluate_model_performance(df, model, scaler, feature_columns, plot=plot)
         except Exception as e2:
             print(f"Error even with small sample: {e2}")
     
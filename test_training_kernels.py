@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+from numpy.lib.stride_tricks import sliding_window_view
+import indicator_kernels
+import training_kernels
+from training_kernels import create_features_batch, OHLCV_COLUMNS
+from predict_api import create_features
+from train_model import FEATURE_COLUMNS
+
+def make_prices(dtype, n_bars=300, seed=1):
+    """Random-walk close and volume with a flat stretch and a NaN gap"""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_bars)))
+    volume = rng.uniform(10, 1000, n_bars)
+    # Flat windows: longer than every window, so means are exact and spreads zero
+    close[100:130] = close[100]
+    volume[100:130] = volume[100]
+    # NaN gap
+    close[200:203] = np.nan
+    volume[200:203] = np.nan
+    return close.astype(dtype), volume.astype(dtype)
+
+def assert_matches(actual, expected):
+    np.testing.assert_allclose(actual, expected, rtol=1e-9, atol=1e-9)
+
+@pytest.fixture
+def pandas_indicators(monkeypatch):
+    """Run the public indicator functions through their pandas fallback"""
+    monkeypatch.setattr(indicator_kernels, 'NUMBA_AVAILABLE', False)
+    return indicator_kernels
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rolling_mean_matches_pandas(dtype, pandas_indicators):
+    close, _ = make_prices(dtype)
+    for window in (5, 10, 20):
+        assert_matches(indicator_kernels._rolling_mean(close, window), pandas_indicators.rolling_mean(close, window))
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rolling_std_matches_pandas(dtype):
+    close, _ = make_prices(dtype)
+    for window in (5, 10):
+        expected = pd.Series(close, dtype=np.float64).rolling(window=window).std().to_numpy()
+        assert_matches(training_kernels.rolling_std(close, window), expected)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rsi_matches_pandas(dtype, pandas_indicators):
+    close, _ = make_prices(dtype)
+    assert_matches(indicator_kernels._rsi(close, 10), pandas_indicators.rsi(close, 10))
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_macd_matches_pandas(dtype, pandas_indicators):
+    close, _ = make_prices(dtype)
+    for actual, expected in zip(indicator_kernels._macd(close, 8, 18, 6), pandas_indicators.macd(close, 8, 18, 6)):
+        assert_matches(actual, expected)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_bollinger_bands_match_pandas(dtype, pandas_indicators):
+    close, _ = make_prices(dtype)
+    kernel = indicator_kernels._bollinger_bands(close, 15, 2.0)
+    fallback = pandas_indicators.bollinger_bands(close, 15, 2.0)
+    for actual, expected in zip(kernel, fallback):
+        assert_matches(actual, expected)
+
+@pytest.mark.parametrize('dtype', [np.float32, np.float64])
+def test_rolling_features_paths_match_pandas(dtype):
+    close, volume = make_prices(dtype)
+    expected = training_kernels._rolling_features_pandas(close, volume)
+    assert_matches(training_kernels._rolling_features(close, volume), expected)
+    if training_kernels.BOTTLENECK_AVAILABLE:
+        assert_matches(training_kernels._rolling_features_bottleneck(close, volume), expected)
+
+def test_scan_targets_matches_sliding_window_max():
+    close, _ = make_prices(np.float32)
+    close = np.ascontiguousarray(close)
+    high = np.ascontiguousarray(close * np.float32(1.002))
+    lookforward, threshold = 30, np.float32(0.01)
+    
+    target = np.zeros(len(close), dtype=np.int8)
+    training_kernels._scan_targets(close, high, lookforward, threshold, target)
+    
+    expected = np.zeros(len(close), dtype=np.int8)
+    max_future_price = sliding_window_view(high[1:], lookforward).max(axis=1)
+    n = len(max_future_price)
+    expected[:n] = (max_future_price - close[:n]) / close[:n] >= threshold
+    assert target.any() and not target.all()
+    np.testing.assert_array_equal(target, expected)
+
+def test_create_features_batch_matches_create_features():
+    """The batch path gives the same model inputs as create_features, symbol by symbol"""
+    rng = np.random.default_rng(0)
+    n_symbols, n_bars = 3, 300
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_symbols, n_bars)), axis=1))
+    open_ = close * (1 + rng.normal(0, 0.002, close.shape))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.005, close.shape))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.005, close.shape))
+    volume = rng.uniform(10, 1000, close.shape)
+    ohlcv_stack = np.stack([open_, high, low, close, volume], axis=2).astype(np.float32)
+    
+    batch = create_features_batch(ohlcv_stack, FEATURE_COLUMNS)
+    
+    for s in range(n_symbols):
+        df = pd.DataFrame(ohlcv_stack[s], columns=OHLCV_COLUMNS)
+        df['Open time'] = np.arange(n_bars, dtype=np.int64) * 60000
+        expected = create_features(df)[FEATURE_COLUMNS].to_numpy(dtype=np.float64)
+        np.testing.assert_allclose(batch[s], expected, rtol=1e-5, atol=1e-6)
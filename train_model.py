@@ -1,14 +1,22 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+from sklearn import set_config
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.model_selection import train_test_split, StratifiedShuffleSplit
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
-from sklearn.preprocessing import StandardScaler
+from sklearn.inspection import permutation_importance
+from sklearn.preprocessing import FunctionTransformer
 import joblib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import gc  # Garbage collection for memory management
 import os
+import json
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from indicator_kernels import macd, rsi
+from training_kernels import future_profit_targets, rolling_features, ROLLING_FEATURE_COLUMNS, limit_threads
 
 # Try to import h5py for HDF5 support (optional optimization)
 try:
@@ -17,13 +25,64 @@ try:
 except ImportError:
     HDF5_AVAILABLE = False
 
+# Try to import pyarrow for the multi-threaded streaming CSV reader (optional optimization)
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Parquet cache of the engineered training rows (used when newer than the CSV and built
+# with the same FEATURE_CACHE_KEY)
+FEATURE_CACHE = 'features.parquet'
+
+# Bump whenever create_features / create_target_optimized change what they compute
+FEATURE_PIPELINE_VERSION = 1
+
+# Target settings of the chunked training path
+PROFIT_THRESHOLD = 0.01
+LOOKFORWARD_PERIODS = 30
+
+# Model input columns, in training order
+FEATURE_COLUMNS = [
+    'Open', 'High', 'Low', 'Close', 'Volume',
+    'price_change', 'high_low_ratio', 'close_open_ratio', 'volume_change',
+    'ma_5', 'ma_10', 'ma_20', 'price_to_ma_5', 'price_to_ma_10', 'price_to_ma_20',
+    'volatility_5', 'volatility_10', 'volume_ma_5', 'volume_ratio',
+    'rsi', 'macd', 'macd_signal', 'macd_histogram',
+    'bb_middle', 'bb_upper', 'bb_lower', 'bb_position'
+]
+
+# Everything the cached rows depend on besides the CSV itself, stored in the parquet metadata
+FEATURE_CACHE_KEY = json.dumps({
+    'pipeline_version': FEATURE_PIPELINE_VERSION,
+    'feature_columns': FEATURE_COLUMNS,
+    'profit_threshold': PROFIT_THRESHOLD,
+    'lookforward_periods': LOOKFORWARD_PERIODS
+}).encode()
+
+# Test rows scored per feature shuffle when the model has no feature_importances_
+PERMUTATION_SAMPLE_SIZE = 20000
+
+# Read OHLCV straight into float32
+OHLCV_DTYPES = {'Open': 'float32', 'High': 'float32', 'Low': 'float32', 'Close': 'float32', 'Volume': 'float32'}
+
 def create_features(df):
-    """Create technical indicators and features from OHLCV data"""
-    df = df.copy()
+    """
+    Create technical indicators and features from OHLCV data
+    Converts the OHLCV / Open time columns of df in place (no defensive copy): pass a frame you own
+    """
+    # Work on float32 OHLCV to halve memory traffic in the rolling/EWM features
+    for col in ['Open', 'High', 'Low', 'Close', 'Volume']:
+        df[col] = df[col].astype(np.float32, copy=False)
     
-    # Convert Open time to datetime
-    df['Open time'] = pd.to_datetime(df['Open time'])
-    df = df.sort_values('Open time').reset_index(drop=True)
+    # Convert Open time to datetime (explicit format skips per-chunk format inference)
+    # and sort only if the rows are out of order; exchange klines normally arrive sorted
+    df['Open time'] = pd.to_datetime(df['Open time'], format='%Y-%m-%d %H:%M:%S', cache=True)
+    if not df['Open time'].is_monotonic_increasing:
+        df = df.sort_values('Open time').reset_index(drop=True)
     
     # Price-based features
     df['price_change'] = df['Close'].pct_change()
@@ -31,43 +90,40 @@ def create_features(df):
     df['close_open_ratio'] = df['Close'] / df['Open']
     df['volume_change'] = df['Volume'].pct_change()
     
+    # All rolling means / standard deviations in one fused pass
+    rolling = pd.DataFrame(
+        rolling_features(df['Close'].to_numpy(), df['Volume'].to_numpy()),
+        columns=ROLLING_FEATURE_COLUMNS, index=df.index
+    )
+    
     # Moving averages (reduced windows for memory efficiency)
     for window in [5, 10, 20]:
-        df[f'ma_{window}'] = df['Close'].rolling(window=window).mean()
+        df[f'ma_{window}'] = rolling[f'ma_{window}']
         df[f'price_to_ma_{window}'] = df['Close'] / df[f'ma_{window}']
     
     # Volatility features
-    df['volatility_5'] = df['Close'].rolling(window=5).std()
-    df['volatility_10'] = df['Close'].rolling(window=10).std()
+    df['volatility_5'] = rolling['volatility_5']
+    df['volatility_10'] = rolling['volatility_10']
     
     # Volume features
-    df['volume_ma_5'] = df['Volume'].rolling(window=5).mean()
+    df['volume_ma_5'] = rolling['volume_ma_5']
     df['volume_ratio'] = df['Volume'] / df['volume_ma_5']
     
-    # RSI-like indicator (reduced window)
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=10).mean()  # Reduced from 14 to 10
-    loss = (-delta.where(delta < 0, 0)).rolling(window=10).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
+    # RSI-like indicator (reduced window from 14 to 10), in one pass
+    df['rsi'] = rsi(df['Close'].to_numpy(), 10)
     
-    # MACD-like indicator (reduced windows)
-    exp1 = df['Close'].ewm(span=8).mean()   # Reduced from 12 to 8
-    exp2 = df['Close'].ewm(span=18).mean()  # Reduced from 26 to 18
-    df['macd'] = exp1 - exp2
-    df['macd_signal'] = df['macd'].ewm(span=6).mean()  # Reduced from 9 to 6
-    df['macd_histogram'] = df['macd'] - df['macd_signal']
+    # MACD-like indicator (reduced windows: spans 8/18/6 instead of 12/26/9), in one pass
+    df['macd'], df['macd_signal'], df['macd_histogram'] = macd(df['Close'].to_numpy(), 8, 18, 6)
     
     # Bollinger Bands (reduced window)
-    df['bb_middle'] = df['Close'].rolling(window=15).mean()  # Reduced from 20 to 15
-    bb_std = df['Close'].rolling(window=15).std()
+    df['bb_middle'] = rolling['bb_middle']  # Reduced from 20 to 15
+    bb_std = rolling['bb_std']
     df['bb_upper'] = df['bb_middle'] + (bb_std * 2)
     df['bb_lower'] = df['bb_middle'] - (bb_std * 2)
     df['bb_position'] = (df['Close'] - df['bb_lower']) / (df['bb_upper'] - df['bb_lower'])
     
     # Clean up intermediate variables
-    del delta, gain, loss, rs, exp1, exp2, bb_std
-    gc.collect()
+    del rolling, bb_std
     
     # ✅ NEW: Clean infinite and extreme values
     print("Cleaning infinite and extreme values...")
@@ -75,36 +131,26 @@ def create_features(df):
     # Replace infinite values with NaN
     df = df.replace([np.inf, -np.inf], np.nan)
     
-    # Cap extreme values using percentiles (99.9th percentile)
-    numeric_columns = df.select_dtypes(include=[np.number]).columns
-    for col in numeric_columns:
-        if col not in ['Open time']:  # Skip datetime columns
-            q99 = df[col].quantile(0.999)
-            q01 = df[col].quantile(0.001)
-            df[col] = df[col].clip(lower=q01, upper=q99)
+    # Cap extreme values using percentiles (one vectorized pass over the numeric block)
+    numeric_columns = df.select_dtypes(include=[np.number]).columns.drop('Open time', errors='ignore')
+    values = df[numeric_columns].to_numpy(dtype=np.float64, copy=True)
+    q01, q99 = np.nanquantile(values, [0.001, 0.999], axis=0)
+    np.clip(values, q01, q99, out=values)
+    df[numeric_columns] = values
     
-    # Handle division by zero cases specifically
-    # Replace NaN ratios with 1.0 (neutral ratio)
-    ratio_columns = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position']
-    for col in ratio_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(1.0)
+    # Keep the features float32 from here on: the NaN fills below and the model both run on narrow data
+    df[FEATURE_COLUMNS] = df[FEATURE_COLUMNS].astype(np.float32, copy=False)
     
-    # Handle percentage changes - replace NaN with 0
+    # Fill NaNs with neutral values in a single fillna pass:
+    # ratios and price-to-MA ratios with 1.0, percentage changes with 0, RSI with 50
+    ratio_columns = ['high_low_ratio', 'close_open_ratio', 'volume_ratio', 'bb_position']
     pct_columns = ['price_change', 'volume_change']
-    for col in pct_columns:
-        if col in df.columns:
-            df[col] = df[col].fillna(0.0)
-    
-    # Handle price-to-MA ratios - replace NaN with 1.0
     ma_ratio_columns = [col for col in df.columns if 'price_to_ma_' in col]
-    for col in ma_ratio_columns:
-        df[col] = df[col].fillna(1.0)
-    
-    # Handle RSI - replace NaN with 50 (neutral)
-    if 'rsi' in df.columns:
-        df['rsi'] = df['rsi'].fillna(50.0)
-        df['rsi'] = df['rsi'].clip(0, 100)  # Ensure RSI is in valid range
+    fill_values = {col: 1.0 for col in ratio_columns + ma_ratio_columns}
+    fill_values.update({col: 0.0 for col in pct_columns})
+    fill_values['rsi'] = 50.0
+    df = df.fillna(fill_values)
+    df['rsi'] = df['rsi'].clip(0, 100)  # Ensure RSI is in valid range
     
     print(f"Data cleaning completed. Shape: {df.shape}")
     
@@ -114,130 +160,250 @@ def create_target_optimized(df, profit_threshold=0.01, lookforward_periods=30):
     """
     Memory-optimized target creation using vectorized operations
     Reduced lookforward_periods from 60 to 30 for memory efficiency
+    Adds the target column to df in place: pass a frame you own
     """
-    df = df.copy()
-    df['target'] = 0
-    
-    # Vectorized approach - more memory efficient
-    close_prices = df['Close'].values
-    high_prices = df['High'].values
-    
     print(f"Creating targets for {len(df) - lookforward_periods} data points...")
     
-    # Process in chunks to save memory
-    chunk_size = 10000
-    for start_idx in range(0, len(df) - lookforward_periods, chunk_size):
-        end_idx = min(start_idx + chunk_size, len(df) - lookforward_periods)
-        
-        for i in range(start_idx, end_idx):
-            current_price = close_prices[i]
-            future_high_slice = high_prices[i+1:i+1+lookforward_periods]
-            
-            if len(future_high_slice) > 0:
-                max_future_price = np.max(future_high_slice)
-                profit_ratio = (max_future_price - current_price) / current_price
-                
-                if profit_ratio >= profit_threshold:
-                    df.iloc[i, df.columns.get_loc('target')] = 1
-        
-        # Progress indicator
-        if (start_idx // chunk_size) % 10 == 0:
-            progress = (end_idx / (len(df) - lookforward_periods)) * 100
-            print(f"Progress: {progress:.1f}%")
+    target = future_profit_targets(df['Close'].values, df['High'].values,
+                                   lookforward_periods, profit_threshold)
     
+    df['target'] = target
     return df
 
+def iter_csv_chunks(path, chunk_size):
+    """Yield the CSV as chunk_size-row DataFrames in one streaming pass (pyarrow reader when available)"""
+    if not PYARROW_AVAILABLE:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=OHLCV_DTYPES)
+        return
+    
+    reader = pa_csv.open_csv(
+        path,
+        read_options=pa_csv.ReadOptions(block_size=64 << 20),
+        convert_options=pa_csv.ConvertOptions(column_types={col: pa.float32() for col in OHLCV_DTYPES})
+    )
+    # Re-slice the large Arrow blocks into chunk_size rows, carrying the remainder forward
+    pending = None
+    for batch in reader:
+        frame = batch.to_pandas()
+        if pending is not None:
+            frame = pd.concat([pending, frame], ignore_index=True)
+        n_full = len(frame) - len(frame) % chunk_size
+        for start in range(0, n_full, chunk_size):
+            yield frame.iloc[start:start + chunk_size].reset_index(drop=True)
+        pending = frame.iloc[n_full:]
+    if pending is not None and len(pending) > 0:
+        yield pending.reset_index(drop=True)
+
+def estimate_csv_rows(path, sample_bytes=1 << 20):
+    """Rough row count of a CSV: file size divided by the bytes per line of its first sample_bytes"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_bytes)
+    n_lines = sample.count(b'\n')
+    if n_lines == 0:
+        return 0
+    return int(os.path.getsize(path) * n_lines / len(sample))
+
+def grow_buffer(buffer, capacity, used):
+    """Copy the first used rows of buffer into a new buffer with room for capacity rows"""
+    grown = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+    grown[:used] = buffer[:used]
+    return grown
+
+def iter_overlapping_chunks(csv_path, chunk_size, overlap_size):
+    """Yield (chunk, has_overlap); every chunk after the first starts with the previous chunk's last overlap_size rows"""
+    processed_rows = 0
+    previous_chunk_tail = None
+    for chunk_count, chunk in enumerate(iter_csv_chunks(csv_path, chunk_size), start=1):
+        chunk_rows = len(chunk)
+        print(f"Processing chunk {chunk_count}, rows {processed_rows}-{processed_rows + chunk_rows}")
+        has_overlap = previous_chunk_tail is not None
+        if has_overlap:
+            chunk = pd.concat([previous_chunk_tail, chunk], ignore_index=True)
+        previous_chunk_tail = chunk.tail(overlap_size).copy()
+        processed_rows += chunk_rows
+        yield chunk, has_overlap
+
+def init_chunk_worker():
+    """Run the kernels single-threaded in worker processes; the pool already uses every core"""
+    limit_threads(1)
+
+def process_chunk(chunk, has_overlap, feature_columns, overlap_size):
+    """
+    Features (float32), targets (int8) and the remaining raw columns (e.g. Open time) of one
+    chunk's clean rows; runs in a worker process
+    """
+    chunk_with_features = create_features(chunk)
+    lookforward_periods = min(LOOKFORWARD_PERIODS, len(chunk) // 10)
+    chunk_with_targets = create_target_optimized(
+        chunk_with_features, 
+        profit_threshold=PROFIT_THRESHOLD, 
+        lookforward_periods=lookforward_periods
+    )
+    chunk_clean = chunk_with_targets[feature_columns + ['target']].dropna()
+    if has_overlap:
+        chunk_clean = chunk_clean.iloc[overlap_size:]
+    return (
+        chunk_clean[feature_columns].to_numpy(dtype=np.float32),
+        chunk_clean['target'].to_numpy(dtype=np.int8),
+        chunk_with_targets.drop(columns=feature_columns + ['target']).iloc[chunk_clean.index]
+    )
+
+def process_chunks_parallel(chunks, feature_columns, overlap_size, max_workers):
+    """Run process_chunk over (chunk, has_overlap) pairs in a process pool, yielding results in chunk order"""
+    if max_workers == 1:
+        for chunk, has_overlap in chunks:
+            yield process_chunk(chunk, has_overlap, feature_columns, overlap_size)
+        return
+    
+    pending = deque()
+    # Spawn fresh workers: forking after the numba kernels have started their threading runtime can deadlock
+    mp_context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context, initializer=init_chunk_worker) as pool:
+        for chunk, has_overlap in chunks:
+            pending.append(pool.submit(process_chunk, chunk, has_overlap, feature_columns, overlap_size))
+            # Bound the chunks in flight so reading never runs far ahead of the workers
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def build_training_data(csv_path, feature_columns):
+    """Engineer features and targets chunk by chunk; returns X, y and the raw rows (for the test set)"""
+    print("Processing data in chunks with feature engineering...")
+    chunk_size = 50000
+    overlap_size = 100
+    max_workers = os.cpu_count() or 1
+    # float32 / int8 buffers sized from the CSV up front instead of concatenating per-chunk
+    # frames at the end; they only grow if the estimate falls short
+    capacity = int(estimate_csv_rows(csv_path) * 1.02) + chunk_size
+    X = np.empty((capacity, len(feature_columns)), dtype=np.float32)
+    y = np.empty(capacity, dtype=np.int8)
+    rows_written = 0
+    all_raw = []  # Non-feature raw columns, for the test set
+    chunks = iter_overlapping_chunks(csv_path, chunk_size, overlap_size)
+    for chunk_count, (X_chunk, y_chunk, raw_chunk) in enumerate(
+            process_chunks_parallel(chunks, feature_columns, overlap_size, max_workers), start=1):
+        n_clean = len(X_chunk)
+        if n_clean > 0:
+            if rows_written + n_clean > len(X):
+                capacity = max(2 * len(X), rows_written + n_clean)
+                X = grow_buffer(X, capacity, rows_written)
+                y = grow_buffer(y, capacity, rows_written)
+            X[rows_written:rows_written + n_clean] = X_chunk
+            y[rows_written:rows_written + n_clean] = y_chunk
+            rows_written += n_clean
+            all_raw.append(raw_chunk)
+        del X_chunk, y_chunk, raw_chunk
+        print(f"Progress: {chunk_count} chunks processed, {rows_written} training rows")
+    print("Combining all processed chunks...")
+    # Shrink the buffers in place (no copy) so their unused tail is released
+    X.resize((rows_written, len(feature_columns)), refcheck=False)
+    y.resize(rows_written, refcheck=False)
+    X_combined = pd.DataFrame(X, columns=feature_columns, copy=False)
+    y_combined = pd.Series(y, name='target', copy=False)
+    # The raw rows share X / y; only the non-feature columns are concatenated
+    raw_combined = X_combined.copy(deep=False)
+    raw_combined['target'] = y_combined
+    other_columns = pd.concat(all_raw, ignore_index=True)
+    for i, col in enumerate(other_columns.columns):
+        raw_combined.insert(i, col, other_columns[col])
+    del X, y, all_raw, other_columns
+    return X_combined, y_combined, raw_combined
+
+def load_feature_cache(csv_path, cache_path=FEATURE_CACHE):
+    """
+    Engineered training rows from the parquet cache, or None if missing, older than the CSV
+    or written with a different FEATURE_CACHE_KEY (feature pipeline, columns or target settings)
+    An unreadable cache is also a miss, so the rows are rebuilt from the CSV
+    """
+    if not PYARROW_AVAILABLE or not os.path.exists(cache_path):
+        return None
+    if os.path.getmtime(cache_path) <= os.path.getmtime(csv_path):
+        return None
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        if metadata.get(b'feature_cache_key') != FEATURE_CACHE_KEY:
+            print(f"Ignoring {cache_path}: built by a different feature pipeline")
+            return None
+        return pq.read_table(cache_path).to_pandas()
+    except Exception as e:
+        print(f"Warning: Could not read {cache_path} due to: {e}")
+        return None
+
+def save_feature_cache(raw_combined, cache_path=FEATURE_CACHE):
+    """
+    Save engineered training rows so later runs can skip feature engineering
+    Written to a temporary file and renamed into place, so an interrupted write never leaves
+    a truncated cache behind
+    """
+    if not PYARROW_AVAILABLE:
+        return
+    tmp_path = f"{cache_path}.tmp"
+    try:
+        table = pa.Table.from_pandas(raw_combined, preserve_index=False)
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b'feature_cache_key': FEATURE_CACHE_KEY})
+        pq.write_table(table, tmp_path, compression='snappy')
+        os.replace(tmp_path, cache_path)
+        print(f"Engineered features cached in {cache_path}")
+    except Exception as e:
+        print(f"Warning: Could not cache features due to: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
 def train_model():
     """Main training function with advanced memory optimizations and 80/20 train/test split"""
     print("Loading data with advanced memory management...")
     
     # Strategy 1: Use memory mapping for large files
     try:
-        print("Analyzing dataset size...")
-        total_rows = sum(1 for line in open('ETHUSD_1m_Binance.csv')) - 1
-        print(f"Total rows in dataset: {total_rows}")
-        
-        print("Processing data in chunks with feature engineering...")
-        chunk_size = 50000
-        all_features = []
-        all_targets = []
-        all_raw = []  # Store raw rows for test set
-        feature_columns = [
-            'Open', 'High', 'Low', 'Close', 'Volume',
-            'price_change', 'high_low_ratio', 'close_open_ratio', 'volume_change',
-            'ma_5', 'ma_10', 'ma_20', 'price_to_ma_5', 'price_to_ma_10', 'price_to_ma_20',
-            'volatility_5', 'volatility_10', 'volume_ma_5', 'volume_ratio',
-            'rsi', 'macd', 'macd_signal', 'macd_histogram',
-            'bb_middle', 'bb_upper', 'bb_lower', 'bb_position'
-        ]
-        chunk_count = 0
-        processed_rows = 0
-        overlap_size = 100
-        previous_chunk_tail = None
-        for chunk in pd.read_csv('ETHUSD_1m_Binance.csv', chunksize=chunk_size):
-            chunk_count += 1
-            print(f"Processing chunk {chunk_count}, rows {processed_rows}-{processed_rows + len(chunk)}")
-            if previous_chunk_tail is not None:
-                chunk = pd.concat([previous_chunk_tail, chunk], ignore_index=True)
-            chunk_with_features = create_features(chunk)
-            lookforward_periods = min(30, len(chunk) // 10)
-            chunk_with_targets = create_target_optimized(
-                chunk_with_features, 
-                profit_threshold=0.01, 
-                lookforward_periods=lookforward_periods
-            )
-            chunk_clean = chunk_with_targets[feature_columns + ['target']].dropna()
-            if previous_chunk_tail is not None:
-                chunk_clean = chunk_clean.iloc[overlap_size:]
-            if len(chunk_clean) > 0:
-                all_features.append(chunk_clean[feature_columns])
-                all_targets.append(chunk_clean['target'])
-                all_raw.append(chunk_with_targets.iloc[chunk_clean.index])
-            previous_chunk_tail = chunk.tail(overlap_size).copy()
-            del chunk, chunk_with_features, chunk_with_targets, chunk_clean
-            gc.collect()
-            processed_rows += chunk_size
-            progress = min((processed_rows / total_rows) * 100, 100)
-            print(f"Progress: {progress:.1f}% - Memory freed after chunk")
-        print("Combining all processed chunks...")
-        X_combined = pd.concat(all_features, ignore_index=True)
-        y_combined = pd.concat(all_targets, ignore_index=True)
-        raw_combined = pd.concat(all_raw, ignore_index=True)
-        del all_features, all_targets, all_raw
-        gc.collect()
+        csv_path = 'ETHUSD_1m_Binance.csv'
+        feature_columns = FEATURE_COLUMNS
+        raw_combined = load_feature_cache(csv_path)
+        if raw_combined is not None:
+            print(f"Loaded engineered features from {FEATURE_CACHE}")
+            X_combined = raw_combined[feature_columns]
+            y_combined = raw_combined['target'].astype(np.int8, copy=False)
+        else:
+            X_combined, y_combined, raw_combined = build_training_data(csv_path, feature_columns)
+            save_feature_cache(raw_combined)
         print(f"Combined data shape: {X_combined.shape}")
         print(f"Target distribution:\n{y_combined.value_counts()}")
         print(f"Profit opportunity percentage: {y_combined.mean()*100:.2f}%")
-        # 80/20 split
-        from sklearn.model_selection import train_test_split
-        X_train, X_test, y_train, y_test, raw_train, raw_test = train_test_split(
-            X_combined, y_combined, raw_combined, test_size=0.2, random_state=42, stratify=y_combined
-        )
+        # 80/20 stratified split on row indices: only the test rows of the wide raw frame are
+        # copied, instead of shuffling every column of it
+        splitter = StratifiedShuffleSplit(n_splits=1, test_size=0.2, random_state=42)
+        train_idx, test_idx = next(splitter.split(np.zeros(len(y_combined)), y_combined))
         # Save test set (raw, with all columns) for later use
-        raw_test.to_csv('test_set.csv', index=False)
-        print(f"Test set saved to test_set.csv with shape: {raw_test.shape}")
-        # Clear unused
-        del X_combined, y_combined, raw_combined, raw_train, raw_test
-        gc.collect()
-        print("Scaling features...")
-        scaler = StandardScaler()
-        X_train_scaled = scaler.fit_transform(X_train)
-        X_test_scaled = scaler.transform(X_test)
-        del X_train, X_test
+        raw_test = raw_combined.iloc[test_idx]
+        if PYARROW_AVAILABLE:
+            raw_test.to_parquet('test_set.parquet', compression='zstd', engine='pyarrow', index=False)
+            print(f"Test set saved to test_set.parquet with shape: {raw_test.shape}")
+        else:
+            raw_test.to_csv('test_set.csv', index=False)
+            print(f"Test set saved to test_set.csv with shape: {raw_test.shape}")
+        # Free the raw rows before training
+        del raw_combined, raw_test
+        # Trees are invariant to feature scaling: skip it and save an identity transformer
+        # so consumers can keep calling scaler.transform()
+        scaler = FunctionTransformer()
+        X_values = X_combined.to_numpy(dtype=np.float32)
+        y_values = y_combined.to_numpy(dtype=np.int8)
+        X_train_values, X_test_values = X_values[train_idx], X_values[test_idx]
+        y_train, y_test = y_values[train_idx], y_values[test_idx]
+        del X_combined, y_combined, X_values, y_values
+        # One collection before fitting, rather than after every chunk
         gc.collect()
-        print("Training Random Forest model...")
-        model = RandomForestClassifier(
-            n_estimators=100,
-            max_depth=15,
-            min_samples_split=10,
-            min_samples_leaf=5,
-            random_state=42,
+        print("Training HistGradientBoosting model...")
+        model = HistGradientBoostingClassifier(
+            max_iter=200,
+            max_depth=None,
+            max_leaf_nodes=63,
+            learning_rate=0.05,
             class_weight='balanced',
-            n_jobs=-1,
-            max_features='sqrt'
+            random_state=42
         )
-        model.fit(X_train_scaled, y_train)
-        return evaluate_and_save_model(model, scaler, feature_columns, X_test_scaled, y_test)
+        model.fit(X_train_values, y_train)
+        return evaluate_and_save_model(model, scaler, feature_columns, X_test_values, y_test)
     except MemoryError:
         print("Memory error with chunk processing. Falling back to smaller chunks...")
         return train_with_smaller_chunks()
@@ -252,31 +418,30 @@ def train_standard_model(X, y, feature_columns):
         X, y, test_size=0.2, random_state=42, stratify=y
     )
     
-    print("Scaling features...")
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
+    # Trees are invariant to feature scaling: skip it and save an identity transformer
+    # so consumers can keep calling scaler.transform()
+    scaler = FunctionTransformer()
+    X_train_values = X_train.to_numpy(dtype=np.float32)
+    X_test_values = X_test.to_numpy(dtype=np.float32)
     
-    # Clear unscaled data
+    # Clear DataFrame copies
     del X, X_train, X_test
     gc.collect()
     
-    print("Training Random Forest model...")
-    model = RandomForestClassifier(
-        n_estimators=100,       # Back to full complexity since we have efficient processing
-        max_depth=15,
-        min_samples_split=10,
-        min_samples_leaf=5,
-        random_state=42,
+    print("Training HistGradientBoosting model...")
+    model = HistGradientBoostingClassifier(
+        max_iter=200,           # Histogram-binned boosting: multi-threaded and far faster than a forest
+        max_depth=None,
+        max_leaf_nodes=63,
+        learning_rate=0.05,
         class_weight='balanced',
-        n_jobs=-1,
-        max_features='sqrt'
+        random_state=42
     )
     
-    model.fit(X_train_scaled, y_train)
+    model.fit(X_train_values, y_train)
     
     # Evaluate and save model
-    return evaluate_and_save_model(model, scaler, feature_columns, X_test_scaled, y_test)
+    return evaluate_and_save_model(model, scaler, feature_columns, X_test_values, y_test)
 
 def train_incremental_model(X, y, feature_columns):
     """Train model incrementally for very large datasets"""
@@ -302,7 +467,9 @@ def train_incremental_model(X, y, feature_columns):
     
     # Fit scaler on a sample to avoid memory issues
     sample_size = min(50000, len(X_train))
-    sample_indices = np.random.choice(len(X_train), sample_size, replace=False)
+    # Generator.choice without shuffle avoids permuting all len(X_train) indices
+    rng = np.random.default_rng(42)
+    sample_indices = rng.choice(len(X_train), sample_size, replace=False, shuffle=False)
     X_sample = X_train.iloc[sample_indices]
     scaler.fit(X_sample)
     
@@ -331,7 +498,6 @@ def train_incremental_model(X, y, feature_columns):
             print(f"Incremental training progress: {progress:.1f}%")
         
         del X_batch, y_batch, X_batch_scaled
-        gc.collect()
     
     # Evaluate on test set
     print("Evaluating incremental model...")
@@ -350,7 +516,7 @@ def train_with_smaller_chunks():
     chunk_count = 0
     max_chunks = 50  # Limit total chunks
     
-    for chunk in pd.read_csv('ETHUSD_1m_Binance.csv', chunksize=chunk_size):
+    for chunk in pd.read_csv('ETHUSD_1m_Binance.csv', chunksize=chunk_size, dtype=OHLCV_DTYPES):
         if chunk_count >= max_chunks:
             break
             
@@ -369,14 +535,7 @@ def train_with_smaller_chunks():
     df = create_features(df)
     df = create_target_optimized(df, profit_threshold=0.01, lookforward_periods=20)
     
-    feature_columns = [
-        'Open', 'High', 'Low', 'Close', 'Volume',
-        'price_change', 'high_low_ratio', 'close_open_ratio', 'volume_change',
-        'ma_5', 'ma_10', 'ma_20', 'price_to_ma_5', 'price_to_ma_10', 'price_to_ma_20',
-        'volatility_5', 'volatility_10', 'volume_ma_5', 'volume_ratio',
-        'rsi', 'macd', 'macd_signal', 'macd_histogram',
-        'bb_middle', 'bb_upper', 'bb_lower', 'bb_position'
-    ]
+    feature_columns = FEATURE_COLUMNS
     
     df_clean = df[feature_columns + ['target']].dropna()
     X = df_clean[feature_columns]
@@ -387,6 +546,7 @@ def train_with_smaller_chunks():
 def evaluate_and_save_model(model, scaler, feature_columns, X_test_scaled, y_test):
     """Common evaluation and saving logic"""
     print("Evaluating model...")
+    X_test_scaled = np.asarray(X_test_scaled, dtype=np.float32)
     y_pred = model.predict(X_test_scaled)
     
     # Handle probability prediction based on model type
@@ -415,22 +575,32 @@ def evaluate_and_save_model(model, scaler, feature_columns, X_test_scaled, y_tes
         plt.savefig('confusion_matrix.png', dpi=100, bbox_inches='tight')
         plt.close()
         
-        # Feature importance (if available)
+        # Feature importance: impurity-based when the model provides it, otherwise
+        # (HistGradientBoosting, SGD) the ROC AUC drop from shuffling each feature on a test sample
         if hasattr(model, 'feature_importances_'):
-            feature_importance = pd.DataFrame({
-                'feature': feature_columns,
-                'importance': model.feature_importances_
-            }).sort_values('importance', ascending=False)
-            
-            print(f"\nTop 10 Feature Importances:")
-            print(feature_importance.head(10))
-            
-            plt.figure(figsize=(8, 6))
-            sns.barplot(data=feature_importance.head(10), y='feature', x='importance')
-            plt.title('Top 10 Feature Importances')
-            plt.tight_layout()
-            plt.savefig('feature_importance.png', dpi=100, bbox_inches='tight')
-            plt.close()
+            importances = model.feature_importances_
+        else:
+            sample_size = min(PERMUTATION_SAMPLE_SIZE, len(X_test_scaled))
+            rng = np.random.default_rng(42)
+            sample_indices = rng.choice(len(X_test_scaled), sample_size, replace=False, shuffle=False)
+            importances = permutation_importance(
+                model, X_test_scaled[sample_indices], np.asarray(y_test)[sample_indices],
+                scoring='roc_auc', n_repeats=3, random_state=42
+            ).importances_mean
+        feature_importance = pd.DataFrame({
+            'feature': feature_columns,
+            'importance': importances
+        }).sort_values('importance', ascending=False)
+        
+        print(f"\nTop 10 Feature Importances:")
+        print(feature_importance.head(10))
+        
+        plt.figure(figsize=(8, 6))
+        sns.barplot(data=feature_importance.head(10), y='feature', x='importance')
+        plt.title('Top 10 Feature Importances')
+        plt.tight_layout()
+        plt.savefig('feature_importance.png', dpi=100, bbox_inches='tight')
+        plt.close()
         
     except Exception as e:
         print(f"Warning: Could not create plots due to: {e}")
@@ -447,6 +617,11 @@ def evaluate_and_save_model(model, scaler, feature_columns, X_test_scaled, y_tes
     return model, scaler, feature_columns
 
 if __name__ == "__main__":
+    # Training rows are free of inf (create_features) and NaN (dropna), so skip scikit-learn's
+    # finiteness scan where one runs: the StandardScaler / SGD incremental path and the metrics.
+    # HistGradientBoosting handles NaN itself and never scans its input, so this does not
+    # change the main training path
+    set_config(assume_finite=True)
     try:
         model, scaler, feature_columns = train_model()
     except MemoryError:
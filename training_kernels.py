@@ -0,0 +1,287 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+from indicator_kernels import (
+    njit, prange, NUMBA_AVAILABLE, _F4, _F8,
+    _window_add, _window_remove, _window_stats, _rolling_mean, _rsi, _macd, _bollinger_bands
+)
+
+# Kernels used only by training (fused rolling features, target scan) and the multi-symbol
+# batch path. Importing this module compiles / loads their signatures, so live prediction
+# imports indicator_kernels alone and never pays for them. Without numba they run as plain
+# Python loops, except rolling_features (bottleneck or pandas) and future_profit_targets (NumPy)
+if NUMBA_AVAILABLE:
+    from numba import set_num_threads
+
+# bottleneck's C moving-window functions stand in for rolling_features when numba is missing
+# (pandas rolling windows when neither is installed)
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+# Read-only C-contiguous float32, for the target scan
+_F4C = "Array(float32, 1, 'C', readonly=True)"
+
+# Input column order of batch_features / create_features_batch
+OHLCV_COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume']
+
+# Feature order produced by batch_features (same columns as create_features)
+BATCH_FEATURE_COLUMNS = [
+    'price_change', 'high_low_ratio', 'close_open_ratio', 'volume_change',
+    'ma_5', 'price_to_ma_5', 'ma_10', 'price_to_ma_10', 'ma_20', 'price_to_ma_20',
+    'volatility_5', 'volatility_10', 'volume_ma_5', 'volume_ratio', 'rsi',
+    'macd', 'macd_signal', 'macd_histogram', 'bb_middle', 'bb_upper', 'bb_lower', 'bb_position'
+]
+
+def limit_threads(n_threads):
+    """Cap the threads used by the parallel kernels (e.g. inside worker processes)"""
+    if NUMBA_AVAILABLE:
+        set_num_threads(n_threads)
+
+@njit([f'float64[:]({_F4}, int64)', f'float64[:]({_F8}, int64)'], cache=True)
+def rolling_std(values, window):
+    """
+    Rolling sample standard deviation with O(1) window updates
+    Matches pandas rolling(window).std() semantics
+    """
+    n = values.shape[0]
+    out = np.full(n, np.nan)
+    nobs = 0
+    mean = 0.0
+    ssqdm = 0.0
+    same_run = 0
+    prev = np.nan
+
+    for i in range(n):
+        nobs, mean, ssqdm, same_run, prev = _window_add(values[i], nobs, mean, ssqdm, same_run, prev)
+        if i >= window:
+            nobs, mean, ssqdm = _window_remove(values[i - window], nobs, mean, ssqdm)
+        if nobs >= window:
+            out[i] = _window_stats(nobs, mean, ssqdm, same_run, prev)[1]
+
+    return out
+
+# Column order of rolling_features
+ROLLING_FEATURE_COLUMNS = ['ma_5', 'ma_10', 'ma_20', 'bb_middle', 'volatility_5', 'volatility_10', 'bb_std', 'volume_ma_5']
+
+def rolling_features(close, volume):
+    """
+    Rolling means / standard deviations of close (windows 5, 10, 15, 20) and volume (window 5)
+    as the (N, 8) ROLLING_FEATURE_COLUMNS
+    Matches pandas rolling(window).mean() / .std() semantics
+    """
+    if NUMBA_AVAILABLE:
+        return _rolling_features(close, volume)
+    if BOTTLENECK_AVAILABLE:
+        return _rolling_features_bottleneck(close, volume)
+    return _rolling_features_pandas(close, volume)
+
+def _rolling_features_bottleneck(close, volume):
+    """rolling_features with bottleneck's C moving-window functions"""
+    close = np.asarray(close, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    out = np.column_stack([
+        bn.move_mean(close, 5), bn.move_mean(close, 10), bn.move_mean(close, 20), bn.move_mean(close, 15),
+        bn.move_std(close, 5, ddof=1), bn.move_std(close, 10, ddof=1), bn.move_std(close, 15, ddof=1),
+        bn.move_mean(volume, 5)
+    ])
+    # Constant windows get an exact mean and zero spread, as in the kernel
+    for window, mean_col, std_col in ((5, 0, 4), (10, 1, 5), (15, 3, 6), (20, 2, -1)):
+        flat = bn.move_max(close, window) == bn.move_min(close, window)
+        out[flat, mean_col] = close[flat]
+        if std_col >= 0:
+            out[flat, std_col] = 0.0
+    flat = bn.move_max(volume, 5) == bn.move_min(volume, 5)
+    out[flat, 7] = volume[flat]
+    return out
+
+def _rolling_features_pandas(close, volume):
+    """rolling_features with pandas rolling windows"""
+    close = pd.Series(close, dtype=np.float64)
+    volume = pd.Series(volume, dtype=np.float64)
+    return np.column_stack([
+        close.rolling(window=5).mean(), close.rolling(window=10).mean(),
+        close.rolling(window=20).mean(), close.rolling(window=15).mean(),
+        close.rolling(window=5).std(), close.rolling(window=10).std(), close.rolling(window=15).std(),
+        volume.rolling(window=5).mean()
+    ])
+
+@njit([f'float64[:, :]({_F4}, {_F4})', f'float64[:, :]({_F8}, {_F8})'], cache=True)
+def _rolling_features(close, volume):
+    """Single-pass kernel behind rolling_features"""
+    n = close.shape[0]
+    out = np.full((n, 8), np.nan)
+    windows = np.array([5, 10, 15, 20])
+    # Output column of each close window's mean and std (-1: not a feature)
+    mean_col = np.array([0, 1, 3, 2])
+    std_col = np.array([4, 5, 6, -1])
+    nobs = np.zeros(4, dtype=np.int64)
+    mean = np.zeros(4)
+    ssqdm = np.zeros(4)
+    same_run = np.zeros(4, dtype=np.int64)
+    prev = np.full(4, np.nan)
+    v_nobs = 0
+    v_mean = 0.0
+    v_ssqdm = 0.0
+    v_same_run = 0
+    v_prev = np.nan
+
+    for i in range(n):
+        for k in range(4):
+            window = windows[k]
+            nobs[k], mean[k], ssqdm[k], same_run[k], prev[k] = _window_add(
+                close[i], nobs[k], mean[k], ssqdm[k], same_run[k], prev[k])
+            if i >= window:
+                nobs[k], mean[k], ssqdm[k] = _window_remove(close[i - window], nobs[k], mean[k], ssqdm[k])
+            if nobs[k] >= window:
+                mid, std = _window_stats(nobs[k], mean[k], ssqdm[k], same_run[k], prev[k])
+                out[i, mean_col[k]] = mid
+                if std_col[k] >= 0:
+                    out[i, std_col[k]] = std
+
+        v_nobs, v_mean, v_ssqdm, v_same_run, v_prev = _window_add(volume[i], v_nobs, v_mean, v_ssqdm, v_same_run, v_prev)
+        if i >= 5:
+            v_nobs, v_mean, v_ssqdm = _window_remove(volume[i - 5], v_nobs, v_mean, v_ssqdm)
+        if v_nobs >= 5:
+            out[i, 7] = _window_stats(v_nobs, v_mean, v_ssqdm, v_same_run, v_prev)[0]
+
+    return out
+
+@njit(cache=True)
+def _ratio(a, b):
+    """a / b, NaN when b is zero (create_features turns those infinities into NaN)"""
+    a = float(a)
+    b = float(b)
+    if b == 0.0:
+        return np.nan
+    return a / b
+
+@njit(cache=True)
+def _one_symbol(ohlcv, out):
+    """Fill out (n_features, n_bars) from one symbol's (5, n_bars) OHLCV rows"""
+    open_, high, low, close, volume = ohlcv[0], ohlcv[1], ohlcv[2], ohlcv[3], ohlcv[4]
+    n = close.shape[0]
+
+    # Price-based features
+    for i in range(n):
+        if i >= 1:
+            out[0, i] = _ratio(close[i], close[i - 1]) - 1.0
+            out[3, i] = _ratio(volume[i], volume[i - 1]) - 1.0
+        else:
+            out[0, i] = np.nan
+            out[3, i] = np.nan
+        out[1, i] = _ratio(high[i], low[i])
+        out[2, i] = _ratio(close[i], open_[i])
+
+    # Moving averages and price-to-MA ratios
+    row = 4
+    for window in (5, 10, 20):
+        ma = _rolling_mean(close, window)
+        out[row] = ma
+        for i in range(n):
+            out[row + 1, i] = _ratio(close[i], ma[i])
+        row += 2
+
+    # Volatility and volume features
+    out[10] = rolling_std(close, 5)
+    out[11] = rolling_std(close, 10)
+    volume_ma = _rolling_mean(volume, 5)
+    out[12] = volume_ma
+    for i in range(n):
+        out[13, i] = _ratio(volume[i], volume_ma[i])
+
+    out[14] = _rsi(close, 10)
+
+    macd_line, signal, histogram = _macd(close, 8, 18, 6)
+    out[15] = macd_line
+    out[16] = signal
+    out[17] = histogram
+
+    middle, upper, lower, position = _bollinger_bands(close, 15, 2.0)
+    out[18] = middle
+    out[19] = upper
+    out[20] = lower
+    out[21] = position
+
+@njit(parallel=True, cache=True)
+def _features(ohlcv, out):
+    for s in prange(ohlcv.shape[0]):
+        _one_symbol(ohlcv[s], out[s])
+
+def batch_features(ohlcv_stack):
+    """
+    Raw features for many symbols at once, one symbol per thread
+    Takes (n_symbols, n_bars, 5) OHLCV in time order and returns
+    (n_symbols, n_bars, len(BATCH_FEATURE_COLUMNS)) float64, before outlier capping / NaN fills
+    """
+    # Column-major per symbol so each kernel streams over contiguous bars
+    ohlcv = np.ascontiguousarray(np.transpose(ohlcv_stack, (0, 2, 1)), dtype=np.float32)
+    out = np.empty((ohlcv.shape[0], len(BATCH_FEATURE_COLUMNS), ohlcv.shape[2]))
+    _features(ohlcv, out)
+    return np.transpose(out, (0, 2, 1))
+
+# NaN fills of create_features (ratios -> 1.0 neutral, percentage changes -> 0.0, RSI -> 50)
+BATCH_FILL_VALUES = {
+    'high_low_ratio': 1.0, 'close_open_ratio': 1.0, 'volume_ratio': 1.0, 'bb_position': 1.0,
+    'price_to_ma_5': 1.0, 'price_to_ma_10': 1.0, 'price_to_ma_20': 1.0,
+    'price_change': 0.0, 'volume_change': 0.0, 'rsi': 50.0
+}
+
+def create_features_batch(ohlcv_stack, feature_columns):
+    """
+    Model-ready features for many symbols at once (e.g. screening or backtests across symbols)
+    Takes (n_symbols, n_bars, 5) OHLCV in time order and returns (n_symbols, n_bars, len(feature_columns))
+    float64 in feature_columns order, capped and NaN-filled per symbol like predict_api.create_features,
+    so each symbol's rows can go straight to scaler.transform / model.predict_proba
+    """
+    ohlcv_stack = np.asarray(ohlcv_stack, dtype=np.float32)
+    columns = OHLCV_COLUMNS + BATCH_FEATURE_COLUMNS
+    features = np.concatenate([ohlcv_stack.astype(np.float64), batch_features(ohlcv_stack)], axis=2)
+    
+    # Cap extreme values per symbol and column over the bars axis (OHLCV included, as in create_features)
+    q01, q99 = np.nanquantile(features, [0.001, 0.999], axis=1, keepdims=True)
+    np.clip(features, q01, q99, out=features)
+    
+    # Fill NaNs with neutral values
+    for col, fill_value in BATCH_FILL_VALUES.items():
+        values = features[:, :, columns.index(col)]
+        values[np.isnan(values)] = fill_value
+    rsi_values = features[:, :, columns.index('rsi')]
+    np.clip(rsi_values, 0, 100, out=rsi_values)
+    
+    return features[:, :, [columns.index(col) for col in feature_columns]]
+
+@njit(f"void({_F4C}, {_F4C}, int64, float32, int8[::1])", parallel=True, cache=True)
+def _scan_targets(close, high, lookforward, threshold, out):
+    for i in prange(close.shape[0] - lookforward):
+        max_future = high[i + 1]
+        for j in range(i + 2, i + 1 + lookforward):
+            # NaN propagates like np.max
+            if high[j] != high[j] or max_future != max_future:
+                max_future = np.nan
+                break
+            if high[j] > max_future:
+                max_future = high[j]
+        if (max_future - close[i]) / close[i] >= threshold:
+            out[i] = 1
+
+def future_profit_targets(close, high, lookforward_periods, profit_threshold):
+    """
+    int8 target: 1 where the max high of the next lookforward_periods bars
+    is at least profit_threshold above the current close (0 when there is no full window)
+    """
+    close = np.ascontiguousarray(close, dtype=np.float32)
+    high = np.ascontiguousarray(high, dtype=np.float32)
+    target = np.zeros(len(close), dtype=np.int8)
+    if not 0 < lookforward_periods < len(close):
+        return target
+
+    if NUMBA_AVAILABLE:
+        _scan_targets(close, high, lookforward_periods, profit_threshold, target)
+    else:
+        max_future_price = sliding_window_view(high[1:], lookforward_periods).max(axis=1)
+        n = len(max_future_price)
+        target[:n] = (max_future_price - close[:n]) / close[:n] >= profit_threshold
+    return target